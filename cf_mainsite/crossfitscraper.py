@@ -5,13 +5,18 @@ Scrapes daily workout from crossfit.com and sends to TRMNL device
 """
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import re
 import datetime
+import time
 import logging
 import os
 import csv
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -21,8 +26,93 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Prefer selectolax's Lexbor binding; fall back to BeautifulSoup (lxml, then html.parser)
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+    from bs4 import BeautifulSoup, SoupStrainer
+    try:
+        import lxml  # noqa: F401
+        _HTML_PARSER = 'lxml'
+    except ImportError:
+        _HTML_PARSER = 'html.parser'
+
+# aiohttp is only needed for backfilling a range of dates
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# orjson is optional; it serializes the webhook payload straight to bytes
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Daily workout page, keyed by the YYMMDD date code
+WORKOUT_URL = "https://www.crossfit.com/{}"
+
+# (connect, read) timeout in seconds for HTTP requests
+REQUEST_TIMEOUT = (5, 20)
+
+# Maximum concurrent page fetches when backfilling
+BACKFILL_CONCURRENCY = 8
+
+# Phrase lists used by the workout heuristics
+SKIP_PHRASES = ('watch now', 'are live', 'shop', 'buy', 'sale', 'click here', 'subscribe')
+TITLE_KEYWORDS = ('games', 'hero', 'benchmark')
+HEADING_SKIP_PATTERNS = (
+    'workout of the day', 'wod', 'scaling', 'stimulus', 'strategy',
+    'coaching', 'resources', 'post', 'compare', 'intermediate option', 'beginner option',
+    'comments'
+)
+WORKOUT_INDICATORS = ('for time:', 'amrap', 'emom', 'rounds for time:', 'complete:')
+SECTION_MARKERS = ('stimulus', 'scaling', 'intermediate option', 'beginner option',
+                   'coaching', 'resources', 'comments', 'post time')
+SCALING_END_MARKERS = ('intermediate option:', 'beginner option:', 'coaching', 'resources', 'stimulus')
+OPTION_HEADERS = ('intermediate option:', 'beginner option:')
+OPTION_END_MARKERS = ('option:', 'coaching', 'resources', 'stimulus', 'comments')
+STIMULUS_END_MARKERS = ('scaling:', 'intermediate option:', 'beginner option:', 'coaching', 'resources')
+HERO_INDICATORS = ('lt.', 'lieutenant', 'sgt.', 'sergeant', 'cpl.', 'corporal',
+                   'pfc.', 'private', 'captain', 'major', 'colonel')
+HERO_PHRASES = ('fallen', 'killed in action', 'kia', 'memorial', 'died', 'gave his life', 'gave her life')
+
+# Precompiled patterns
+_RE_COMMENT = re.compile('comment', re.I)
+_RE_BODY = re.compile(r'<body', re.I)
+_RE_COMMENTS_ON = re.compile(r'>[^<]*Comments on \d+', re.I)  # Anywhere in element text, not in attributes
+_RE_EVENT_NUM = re.compile(r'event\s+\d+')
+_RE_TITLE_WORD = re.compile(r'^[A-Z][a-z]+$')
+# Rep/distance + movement; whitespace excludes newlines so matches stay within one line
+_RE_MOVEMENT = re.compile(r'(\d+(?:,\d+)?(?:-meter|-mile)?)[^\S\n]+((?:[a-zA-Z\-]|[^\S\n])+?)(?=\n|,|$)')
+
+def _phrase_pattern(phrases):
+    """Compile phrases into one alternation so a single search finds any of them"""
+    return re.compile('|'.join(map(re.escape, phrases)))
+
+_RE_SKIP_PHRASES = _phrase_pattern(SKIP_PHRASES)
+_RE_TITLE_KEYWORDS = _phrase_pattern(TITLE_KEYWORDS)
+_RE_HEADING_SKIP = _phrase_pattern(HEADING_SKIP_PATTERNS)
+_RE_WORKOUT_INDICATORS = _phrase_pattern(WORKOUT_INDICATORS)
+_RE_SECTION_MARKERS = _phrase_pattern(SECTION_MARKERS)
+_RE_SCALING_END = _phrase_pattern(SCALING_END_MARKERS)
+_RE_OPTION_END = _phrase_pattern(OPTION_END_MARKERS)
+_RE_STIMULUS_END = _phrase_pattern(STIMULUS_END_MARKERS)
+_RE_HERO_INDICATORS = _phrase_pattern(HERO_INDICATORS)
+_RE_HERO_PHRASES = _phrase_pattern(HERO_PHRASES)
+
+# CSV column order
+CSV_FIELDNAMES = [
+    'date_code', 'date', 'title', 'is_named_workout', 'is_hero_workout', 'is_rest_day',
+    'description', 'movements', 'scaling', 'stimulus', 'scraped_at', 'url'
+]
+
 class WorkoutData:
     """Data structure for CrossFit workout information"""
+    __slots__ = ('title', 'description', 'movements', 'scaling', 'stimulus', 'date', 'date_code',
+                 'is_named_workout', 'is_hero_workout', 'is_rest_day', 'scraped_at')
+    
     def __init__(self, title, description, movements, scaling, stimulus, date, date_code, 
                  is_named_workout=False, is_hero_workout=False, is_rest_day=False, scraped_at=""):
         self.title = title
@@ -37,22 +127,26 @@ class WorkoutData:
         self.is_rest_day = is_rest_day
         self.scraped_at = scraped_at
     
+    def to_csv_tuple(self):
+        """Convert to a CSV row in CSV_FIELDNAMES order"""
+        return (
+            self.date_code,
+            self.date,
+            self.title,
+            str(self.is_named_workout),
+            str(self.is_hero_workout),
+            str(self.is_rest_day),
+            self.description.replace('\n', ' | ').replace('\r', ''),
+            ' | '.join(self.movements) if self.movements else '',
+            self.scaling.replace('\n', ' | ').replace('\r', ''),
+            self.stimulus.replace('\n', ' | ').replace('\r', ''),
+            self.scraped_at,
+            WORKOUT_URL.format(self.date_code)
+        )
+    
     def to_csv_row(self):
         """Convert to CSV-friendly format"""
-        return {
-            'date_code': self.date_code,
-            'date': self.date,
-            'title': self.title,
-            'is_named_workout': str(self.is_named_workout),
-            'is_hero_workout': str(self.is_hero_workout),
-            'is_rest_day': str(self.is_rest_day),
-            'description': self.description.replace('\n', ' | ').replace('\r', ''),
-            'movements': ' | '.join(self.movements) if self.movements else '',
-            'scaling': self.scaling.replace('\n', ' | ').replace('\r', ''),
-            'stimulus': self.stimulus.replace('\n', ' | ').replace('\r', ''),
-            'scraped_at': self.scraped_at,
-            'url': f"https://www.crossfit.com/{self.date_code}"
-        }
+        return dict(zip(CSV_FIELDNAMES, self.to_csv_tuple()))
 
 class CrossFitWODScraper:
     """Scrapes workout data from crossfit.com"""
@@ -60,41 +154,65 @@ class CrossFitWODScraper:
     def __init__(self):
         self.session = requests.Session()
         self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+            'Accept-Encoding': requests.utils.DEFAULT_ACCEPT_ENCODING,
+            'Connection': 'keep-alive'
         })
+        
+        # Reuse pooled connections and retry transient failures with backoff
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=4,
+            max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
     
     def get_workout_url(self, date=None):
         """Generate the CrossFit workout URL for a specific date"""
         if date is None:
             date = datetime.date.today()
         
-        date_str = date.strftime("%y%m%d")
-        return f"https://www.crossfit.com/{date_str}"
+        return WORKOUT_URL.format(date.strftime("%y%m%d"))
     
     def fetch_workout_page(self, date=None):
         """Fetch the workout page HTML and return HTML + date string"""
-        workout_url = self.get_workout_url(date)
-        date_str = date.strftime("%y%m%d") if date else datetime.date.today().strftime("%y%m%d")
+        date_str = (date or datetime.date.today()).strftime("%y%m%d")
+        workout_url = WORKOUT_URL.format(date_str)
         
         try:
             logger.info(f"Fetching workout from: {workout_url}")
-            response = self.session.get(workout_url)
+            response = self.session.get(workout_url, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             return response.text, date_str
         except requests.RequestException as e:
             logger.error(f"Failed to fetch workout page from {workout_url}: {e}")
             raise
     
+    async def fetch_workout_page_async(self, session, date):
+        """Fetch the workout page HTML with an aiohttp session and return HTML + date string"""
+        date_str = date.strftime("%y%m%d")
+        workout_url = WORKOUT_URL.format(date_str)
+        
+        try:
+            logger.info(f"Fetching workout from: {workout_url}")
+            async with session.get(workout_url) as response:
+                response.raise_for_status()
+                return await response.text(), date_str
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Failed to fetch workout page from {workout_url}: {e}")
+            raise
+    
     def parse_workout_data(self, html, date_str):
         """Parse the workout data from HTML"""
-        soup = BeautifulSoup(html, 'html.parser')
+        bold_texts, heading_texts, all_text = self._parse_page(html)
         
         # Get formatted date for display
         date_obj = datetime.datetime.strptime(date_str, "%y%m%d").date()
         formatted_date = date_obj.strftime("%B %d, %Y")
         
         # Extract workout content
-        workout_content = self._extract_workout_content(soup, date_str)
+        workout_content = self._extract_workout_content(bold_texts, heading_texts, all_text, date_str)
         
         return WorkoutData(
             title=workout_content.get('title', date_str),
@@ -110,8 +228,98 @@ class CrossFitWODScraper:
             scraped_at=datetime.datetime.now().isoformat()
         )
     
-    def _extract_workout_content(self, soup, date_str):
-        """Extract workout content from the parsed HTML"""
+    def _parse_page(self, html):
+        """Parse HTML into (bold texts, heading texts, page text) with comments stripped"""
+        # Everything from the "Comments on <date>" header onwards is user comments, so cut it before parsing
+        body = _RE_BODY.search(html)
+        match = _RE_COMMENTS_ON.search(html, body.start() if body else 0)
+        if match:
+            html = html[:match.start() + 1]  # Keep the '>' closing the header's opening tag
+        
+        if LexborHTMLParser is not None:
+            return self._parse_page_lexbor(html)
+        return self._parse_page_soup(html)
+    
+    def _parse_page_lexbor(self, html):
+        """Parse the page with selectolax's Lexbor parser"""
+        tree = LexborHTMLParser(html)
+        if tree.body is None:
+            return [], [], ''
+        
+        # BeautifulSoup's get_text() skips script/style contents, so drop them to match
+        tree.strip_tags(['script', 'style'])
+        
+        # Remove comment sections to avoid parsing user comments
+        for comment_section in tree.body.css('div[class*="comment" i], section[class*="comment" i]'):
+            comment_section.decompose()
+        
+        # Only look inside the <article> holding the workout, skipping nav, footer and promos around it
+        root, text = tree.body, None
+        for article in tree.body.css('article'):
+            article_text = self._lexbor_text(article)
+            if _RE_WORKOUT_INDICATORS.search(article_text.lower()):
+                root, text = article, article_text
+                break
+        
+        # Collect bold and heading texts in one query
+        bold_texts, heading_texts = [], []
+        for node in root.css('strong, b, h1, h2, h3'):
+            if node.tag in ('strong', 'b'):
+                bold_texts.append(node.text().strip())
+            else:
+                heading_texts.append(node.text().strip())
+        return bold_texts, heading_texts, text if text is not None else self._lexbor_text(root)
+    
+    def _lexbor_text(self, root):
+        """Join the text under root the way BeautifulSoup's get_text() does"""
+        parts = []
+        for node in root.traverse(include_text=True):
+            if node.tag != '-text':
+                continue
+            
+            # BeautifulSoup collapses whitespace-only strings outside <pre>/<textarea>
+            text = node.text_content
+            if not text.strip() and node.parent.tag not in ('pre', 'textarea'):
+                text = '\n' if '\n' in text else ' '
+            parts.append(text)
+        return ''.join(parts)
+    
+    def _parse_page_soup(self, html):
+        """Parse the page with BeautifulSoup"""
+        # Only build a tree for <article>s, skipping nav, footer and comments around them
+        soup, text = None, None
+        if '<article' in html:
+            articles = BeautifulSoup(html, _HTML_PARSER, parse_only=SoupStrainer('article'))
+            self._remove_comment_sections(articles)
+            
+            # Use the article holding the workout, not promos around it
+            for article in articles.find_all('article'):
+                article_text = article.get_text()
+                if _RE_WORKOUT_INDICATORS.search(article_text.lower()):
+                    soup, text = article, article_text
+                    break
+        
+        if soup is None:
+            soup = BeautifulSoup(html, _HTML_PARSER)
+            self._remove_comment_sections(soup)
+            text = soup.get_text()
+        
+        # Collect bold and heading texts in one walk of the tree
+        bold_texts, heading_texts = [], []
+        for tag in soup.find_all(['strong', 'b', 'h1', 'h2', 'h3']):
+            if tag.name in ('strong', 'b'):
+                bold_texts.append(tag.get_text().strip())
+            else:
+                heading_texts.append(tag.get_text().strip())
+        return bold_texts, heading_texts, text
+    
+    def _remove_comment_sections(self, soup):
+        """Remove comment sections to avoid parsing user comments"""
+        for comment_section in soup.find_all(['div', 'section'], class_=_RE_COMMENT):
+            comment_section.decompose()
+    
+    def _extract_workout_content(self, bold_texts, heading_texts, all_text, date_str):
+        """Extract workout content from the parsed page text"""
         content = {
             'title': date_str,
             'description': '',
@@ -123,20 +331,7 @@ class CrossFitWODScraper:
             'is_rest_day': False
         }
         
-        # Remove comment sections to avoid parsing user comments
-        for comment_section in soup.find_all(['div', 'section'], class_=re.compile('comment', re.I)):
-            comment_section.decompose()
-        
-        # Look for elements with "Comments on" text and remove everything after
-        for element in soup.find_all(string=re.compile(r'Comments on \d+', re.I)):
-            parent = element.find_parent()
-            if parent:
-                # Remove this element and all following siblings
-                for sibling in parent.find_next_siblings():
-                    sibling.decompose()
-                parent.decompose()
-        
-        page_text = soup.get_text().lower()
+        page_text = all_text.lower()
         
         # Look for Rest Day indicator first
         if 'rest day' in page_text:
@@ -148,38 +343,32 @@ class CrossFitWODScraper:
         potential_titles = []
         
         # Check for text in strong/b tags
-        for bold in soup.find_all(['strong', 'b']):
-            text = bold.get_text().strip()
+        for text in bold_texts:
             if text and len(text) > 5 and len(text) <= 50:
+                tl = text.lower()
+                
                 # Skip promotional banners and watch now messages
-                skip_phrases = ['watch now', 'are live', 'shop', 'buy', 'sale', 'click here', 'subscribe']
-                if any(phrase in text.lower() for phrase in skip_phrases):
+                if _RE_SKIP_PHRASES.search(tl):
                     continue
                 
                 # Prioritize titles with "Event" followed by a number
-                if re.search(r'event\s+\d+', text.lower()):
+                if _RE_EVENT_NUM.search(tl):
                     potential_titles.insert(0, text)  # Put at beginning of list
                 # Check if it looks like a title (contains Games, Event, Hero name, etc.)
-                elif any(keyword in text.lower() for keyword in ['games', 'hero', 'benchmark']):
+                elif _RE_TITLE_KEYWORDS.search(tl):
                     potential_titles.append(text)
                 elif text.isupper() or (text[0].isupper() and not any(c.islower() for c in text[1:])):
                     potential_titles.append(text)
         
         # Also check headings
-        for heading in soup.find_all(['h1', 'h2', 'h3']):
-            text = heading.get_text().strip()
+        for text in heading_texts:
+            tl = text.lower()
             
-            skip_patterns = [
-                'workout of the day', 'wod', 'scaling', 'stimulus', 'strategy',
-                'coaching', 'resources', 'post', 'compare', 'intermediate option', 'beginner option',
-                'comments'
-            ]
-            
-            if text and len(text) <= 50 and not any(skip in text.lower() for skip in skip_patterns):
+            if text and len(text) <= 50 and not _RE_HEADING_SKIP.search(tl):
                 if (text.isupper() or text.istitle() or 
-                    re.match(r'^[A-Z][a-z]+$', text) or 
-                    'games' in text.lower() or
-                    'event' in text.lower()):
+                    _RE_TITLE_WORD.match(text) or 
+                    'games' in tl or
+                    'event' in tl):
                     potential_titles.append(text)
         
         # Use the first good title found
@@ -191,138 +380,89 @@ class CrossFitWODScraper:
             if 'games' in potential_titles[0].lower():
                 content['is_named_workout'] = True
         
-        # Extract main workout description
+        # Walk the page lines once, collecting the workout description along with the
+        # scaling, intermediate/beginner option and stimulus sections
+        lines = all_text.split('\n')
+        lower_lines = page_text.split('\n')  # Lowercased once, line-aligned with lines
+        
         workout_lines = []
         found_workout = False
-        workout_title_candidate = None
+        workout_done = False
         
-        # Look for "For time:" or similar workout indicators
-        all_text = soup.get_text()
-        lines = all_text.split('\n')
+        scaling_lines = []
+        scaling_section_found = False
+        option_blocks = {option_type: [] for option_type in OPTION_HEADERS}
+        stimulus_lines = []
+        stimulus_section_found = False
         
-        for i, line in enumerate(lines):
-            line = line.strip()
+        # Sections currently collecting lines: name -> (header line index, lines, end marker pattern)
+        open_sections = {}
+        
+        for i, raw_line in enumerate(lines):
+            line = raw_line.strip()
+            ll = lower_lines[i]
             
-            # Skip empty lines and comments
-            if not line or 'commented on:' in line.lower():
-                continue
+            # Feed the line to open sections, which take up to 9 lines after their header
+            for name, (start, collected, end_markers) in list(open_sections.items()):
+                if i - start >= 10:
+                    del open_sections[name]
+                elif line:
+                    if end_markers.search(ll):
+                        del open_sections[name]
+                    elif not line.startswith('**'):  # Skip markdown formatting
+                        collected.append(line)
             
-            # Check if this line might be a workout title (appears right before workout)
-            if i > 0 and i < len(lines) - 1:
-                next_line = lines[i + 1].strip() if i + 1 < len(lines) else ""
-                if any(indicator in next_line.lower() for indicator in ['for time:', 'amrap', 'emom', 'rounds for time:', 'complete:']):
-                    # This line might be the workout title
-                    if 'event' in line.lower() or 'games' in line.lower():
-                        workout_title_candidate = line.replace('**', '').strip()
+            # Workout description runs from the first "For time:"-style indicator to the next section marker
+            if not workout_done and line and 'commented on:' not in ll:
+                if _RE_WORKOUT_INDICATORS.search(ll):
+                    found_workout = True
                 
-            # Look for workout start indicators
-            if any(indicator in line.lower() for indicator in ['for time:', 'amrap', 'emom', 'rounds for time:', 'complete:']):
-                found_workout = True
+                if found_workout:
+                    if _RE_SECTION_MARKERS.search(ll):
+                        workout_done = True
+                    elif not line.startswith('**'):  # Skip markdown formatting
+                        workout_lines.append(line)
             
-            # If we found the workout, collect lines until we hit a section marker
-            if found_workout:
-                section_markers = ['stimulus', 'scaling', 'intermediate option', 'beginner option', 
-                                 'coaching', 'resources', 'comments', 'post time']
-                
-                if any(marker in line.lower() for marker in section_markers):
-                    break
-                    
-                if line and not line.startswith('**'):  # Skip markdown formatting
-                    workout_lines.append(line)
+            # Only the first scaling section is used
+            if not scaling_section_found and 'scaling:' in ll:
+                scaling_section_found = True
+                open_sections['scaling'] = (i, scaling_lines, _RE_SCALING_END)
+            
+            # Every Intermediate/Beginner option is kept, headed by its own line
+            for option_type, blocks in option_blocks.items():
+                if option_type in ll:
+                    option_text = [raw_line]
+                    blocks.append(option_text)
+                    open_sections[option_type] = (i, option_text, _RE_OPTION_END)
+            
+            # Only the first stimulus/strategy section is used
+            if not stimulus_section_found and ('stimulus and strategy:' in ll or 'stimulus:' in ll):
+                stimulus_section_found = True
+                open_sections['stimulus'] = (i, stimulus_lines, _RE_STIMULUS_END)
         
         if workout_lines:
             content['description'] = '\n'.join(workout_lines[:10])  # Limit to first 10 lines
         
-        # Extract movements from the description
-        movements = []
-        movement_patterns = [
-            r'(\d+(?:,\d+)?(?:-meter|-mile)?)\s+([a-zA-Z\-\s]+)',
-            r'([A-Z][a-zA-Z\-\s]+?)(?=\n|♀|♂|\d|$)',
-        ]
-        
-        for line in workout_lines:
-            # Look for distance/rep + movement patterns
-            matches = re.findall(r'(\d+(?:,\d+)?(?:-meter|-mile)?)\s+([a-zA-Z\-\s]+?)(?=\n|,|$)', line)
-            for match in matches:
-                if len(match) == 2:
-                    movement = f"{match[0]} {match[1].strip()}"
-                    if 3 < len(movement) < 50:
-                        movements.append(movement)
+        # Extract movements from the description, scanning all workout lines in one search
+        movements = [f"{reps} {name.strip()}" for reps, name in _RE_MOVEMENT.findall('\n'.join(workout_lines))]
+        movements = [movement for movement in movements if 3 < len(movement) < 50]
         
         content['movements'] = list(dict.fromkeys(movements))[:8]  # Remove duplicates, limit to 8
         
-        # Extract scaling information more carefully
-        scaling_parts = []
-        
-        # Method 1: Look for specific scaling section
-        scaling_section_found = False
-        for i, line in enumerate(lines):
-            if 'scaling:' in line.lower():
-                scaling_section_found = True
-                # Collect the next few lines until we hit another section
-                for j in range(i+1, min(i+10, len(lines))):
-                    next_line = lines[j].strip()
-                    if not next_line:
-                        continue
-                    if any(marker in next_line.lower() for marker in ['intermediate option:', 'beginner option:', 
-                                                                       'coaching', 'resources', 'stimulus']):
-                        break
-                    if next_line and not next_line.startswith('**'):
-                        scaling_parts.append(next_line)
-                break
-        
-        # Method 2: Look for Intermediate and Beginner options
-        for option_type in ['intermediate option:', 'beginner option:']:
-            for i, line in enumerate(lines):
-                if option_type in line.lower():
-                    option_text = [line]
-                    
-                    # Collect the workout description for this option
-                    for j in range(i+1, min(i+10, len(lines))):
-                        next_line = lines[j].strip()
-                        if not next_line:
-                            continue
-                        # Stop at next section or option
-                        if any(marker in next_line.lower() for marker in ['option:', 'coaching', 'resources', 'stimulus', 'comments']):
-                            break
-                        if next_line and not next_line.startswith('**'):
-                            option_text.append(next_line)
-                    
-                    if len(option_text) > 1:
-                        scaling_parts.append('\n'.join(option_text))
+        # Scaling lines come first, then the Intermediate and Beginner options
+        scaling_parts = list(scaling_lines)
+        for blocks in option_blocks.values():
+            scaling_parts.extend('\n'.join(option_text) for option_text in blocks if len(option_text) > 1)
         
         if scaling_parts:
             content['scaling'] = '\n\n'.join(scaling_parts)
         
-        # Extract stimulus/strategy information
-        stimulus_section_found = False
-        stimulus_lines = []
-        
-        for i, line in enumerate(lines):
-            if 'stimulus and strategy:' in line.lower() or 'stimulus:' in line.lower():
-                stimulus_section_found = True
-                # Collect the next few lines
-                for j in range(i+1, min(i+10, len(lines))):
-                    next_line = lines[j].strip()
-                    if not next_line:
-                        continue
-                    if any(marker in next_line.lower() for marker in ['scaling:', 'intermediate option:', 
-                                                                       'beginner option:', 'coaching', 'resources']):
-                        break
-                    if next_line and not next_line.startswith('**'):
-                        stimulus_lines.append(next_line)
-                break
-        
         if stimulus_lines:
             content['stimulus'] = ' '.join(stimulus_lines)
         
         # Hero workout detection (keep the existing logic but be more strict)
-        hero_indicators = ['lt.', 'lieutenant', 'sgt.', 'sergeant', 'cpl.', 'corporal', 
-                          'pfc.', 'private', 'captain', 'major', 'colonel']
-        hero_phrases = ['fallen', 'killed in action', 'kia', 'memorial', 'died', 'gave his life', 'gave her life']
-        
-        has_military_rank = any(indicator in page_text for indicator in hero_indicators)
-        has_memorial_language = any(phrase in page_text for phrase in hero_phrases)
+        has_military_rank = bool(_RE_HERO_INDICATORS.search(page_text))
+        has_memorial_language = bool(_RE_HERO_PHRASES.search(page_text))
         is_reference_only = ('reminiscent of a hero workout' in page_text or 
                            'similar to' in page_text or 
                            'like the hero workout' in page_text)
@@ -336,51 +476,66 @@ class CrossFitWODScraper:
 class CSVLogger:
     """Logs workout data to CSV file"""
     
-    def __init__(self, csv_file_path="crossfit_workouts.csv"):
+    def __init__(self, csv_file_path="crossfit_workouts.csv", flush_each=True):
         self.csv_file_path = Path(csv_file_path)
-        self.fieldnames = [
-            'date_code', 'date', 'title', 'is_named_workout', 'is_hero_workout', 'is_rest_day',
-            'description', 'movements', 'scaling', 'stimulus', 'scraped_at', 'url'
-        ]
+        self.fieldnames = list(CSV_FIELDNAMES)
+        self.flush_each = flush_each  # fsync after every write so a crash can't lose or tear rows
+        self._date_codes = None  # Loaded lazily from the CSV on first lookup
         self._ensure_csv_exists()
     
     def _ensure_csv_exists(self):
         """Create CSV file with headers if it doesn't exist"""
         if not self.csv_file_path.exists():
             with open(self.csv_file_path, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=self.fieldnames)
-                writer.writeheader()
+                writer = csv.writer(csvfile)
+                writer.writerow(self.fieldnames)
+            self._date_codes = set()
             logger.info(f"Created new CSV file: {self.csv_file_path}")
     
+    def _load_date_codes(self):
+        """Read the set of date codes already in the CSV file"""
+        with open(self.csv_file_path, 'r', newline='', encoding='utf-8') as csvfile:
+            reader = csv.reader(csvfile)
+            header = next(reader, None)
+            if not header or 'date_code' not in header:
+                return set()
+            
+            column = header.index('date_code')
+            return {row[column] for row in reader if len(row) > column}
+    
     def workout_exists(self, date_code):
         """Check if a workout for this date already exists in CSV"""
         if not self.csv_file_path.exists():
             return False
         
-        try:
-            with open(self.csv_file_path, 'r', encoding='utf-8') as csvfile:
-                reader = csv.DictReader(csvfile)
-                for row in reader:
-                    if row.get('date_code') == date_code:
-                        return True
-        except Exception as e:
-            logger.warning(f"Error reading CSV file: {e}")
+        if self._date_codes is None:
+            try:
+                self._date_codes = self._load_date_codes()
+            except Exception as e:
+                logger.warning(f"Error reading CSV file: {e}")
+                return False
         
-        return False
+        return date_code in self._date_codes
+    
+    def _sync(self, csvfile):
+        """Flush csvfile through to disk if flush_each is set"""
+        if self.flush_each:
+            csvfile.flush()
+            os.fsync(csvfile.fileno())
     
     def log_workout(self, workout, overwrite=False):
         """Log workout data to CSV file"""
         try:
-            if not overwrite and self.workout_exists(workout.date_code):
+            exists = self.workout_exists(workout.date_code)
+            
+            if exists and not overwrite:
                 logger.info(f"Workout {workout.date_code} already exists in CSV. Skipping.")
                 return True
             
-            if overwrite and self.workout_exists(workout.date_code):
-                self._update_existing_workout(workout)
+            if exists:
+                self._update_existing_workouts({workout.date_code: workout})
             else:
-                with open(self.csv_file_path, 'a', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.DictWriter(csvfile, fieldnames=self.fieldnames)
-                    writer.writerow(workout.to_csv_row())
+                self._append_workouts([workout])
             
             logger.info(f"Logged workout {workout.date_code} ({workout.title}) to CSV")
             return True
@@ -389,21 +544,75 @@ class CSVLogger:
             logger.error(f"Failed to log workout to CSV: {e}")
             return False
     
-    def _update_existing_workout(self, workout):
-        """Update an existing workout in the CSV file"""
-        rows = []
-        with open(self.csv_file_path, 'r', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                if row.get('date_code') == workout.date_code:
-                    rows.append(workout.to_csv_row())
+    def log_workouts(self, workouts, overwrite=False):
+        """Log a batch of workouts to CSV with at most one rewrite and one append"""
+        try:
+            updates = {}
+            appends = {}
+            
+            for workout in workouts:
+                if not self.workout_exists(workout.date_code):
+                    appends[workout.date_code] = workout
+                elif overwrite:
+                    updates[workout.date_code] = workout
                 else:
-                    rows.append(row)
+                    logger.info(f"Workout {workout.date_code} already exists in CSV. Skipping.")
+            
+            if updates:
+                self._update_existing_workouts(updates)
+            if appends:
+                self._append_workouts(appends.values())
+            
+            logger.info(f"Logged {len(updates) + len(appends)} workouts to CSV")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to log workouts to CSV: {e}")
+            return False
+    
+    def _append_workouts(self, workouts):
+        """Append new workouts to the end of the CSV file"""
+        buffering = 1 if self.flush_each else -1  # Line-buffered when flushing each row
+        with open(self.csv_file_path, 'a', newline='', encoding='utf-8', buffering=buffering) as csvfile:
+            writer = csv.writer(csvfile)
+            for workout in workouts:
+                writer.writerow(workout.to_csv_tuple())
+                if self._date_codes is not None:
+                    self._date_codes.add(workout.date_code)
+            self._sync(csvfile)
+    
+    def _update_existing_workouts(self, workouts):
+        """Update existing workouts in the CSV file, given a dict of date_code -> workout"""
+        tmp_path = self.csv_file_path.with_suffix('.tmp')
+        new_rows = {date_code: workout.to_csv_tuple() for date_code, workout in workouts.items()}
         
-        with open(self.csv_file_path, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=self.fieldnames)
-            writer.writeheader()
-            writer.writerows(rows)
+        # Stream rows into a temp file, swapping in the new rows, then atomically replace the CSV
+        try:
+            with open(self.csv_file_path, 'r', newline='', encoding='utf-8') as src, \
+                    open(tmp_path, 'w', newline='', encoding='utf-8') as dst:
+                reader = csv.reader(src)
+                writer = csv.writer(dst)
+                
+                header = next(reader, None) or self.fieldnames
+                column = header.index('date_code')
+                writer.writerow(header)
+                
+                # Files written with a different column layout get the new rows in their own order
+                if header != self.fieldnames:
+                    for date_code, new_row in new_rows.items():
+                        values = dict(zip(self.fieldnames, new_row))
+                        new_rows[date_code] = [values.get(name, '') for name in header]
+                
+                for row in reader:
+                    new_row = new_rows.get(row[column]) if len(row) > column else None
+                    writer.writerow(new_row if new_row is not None else row)
+                
+                self._sync(dst)
+            
+            os.replace(tmp_path, self.csv_file_path)
+        except Exception:
+            tmp_path.unlink(missing_ok=True)
+            raise
     
     def get_workout_stats(self):
         """Get basic statistics about logged workouts"""
@@ -419,22 +628,37 @@ class CSVLogger:
         }
         
         try:
-            with open(self.csv_file_path, 'r', encoding='utf-8') as csvfile:
-                reader = csv.DictReader(csvfile)
+            with open(self.csv_file_path, 'r', newline='', encoding='utf-8') as csvfile:
+                reader = csv.reader(csvfile)
+                header = next(reader, None)
+                if header is None:
+                    return stats
+                
+                # Resolve column positions once instead of building a dict per row
+                named_col = header.index('is_named_workout')
+                hero_col = header.index('is_hero_workout')
+                rest_col = header.index('is_rest_day')
+                title_col = header.index('title')
+                width = max(named_col, hero_col, rest_col, title_col) + 1
                 
                 for row in reader:
+                    if not row:
+                        continue  # DictReader skipped blank lines too
+                    if len(row) < width:
+                        row += [''] * (width - len(row))
+                    
                     stats['total_workouts'] += 1
                     
-                    if row.get('is_named_workout') == 'True':
+                    if row[named_col] == 'True':
                         stats['named_workouts'] += 1
                     
-                    if row.get('is_hero_workout') == 'True':
+                    if row[hero_col] == 'True':
                         stats['hero_workouts'] += 1
                     
-                    if row.get('is_rest_day') == 'True':
+                    if row[rest_col] == 'True':
                         stats['rest_days'] += 1
                     
-                    stats['most_recent'] = row.get('title')
+                    stats['most_recent'] = row[title_col]
         
         except Exception as e:
             logger.warning(f"Error calculating stats: {e}")
@@ -446,6 +670,7 @@ class TRMNLWebhookSender:
     
     def __init__(self, webhook_url):
         self.webhook_url = webhook_url
+        self.session = requests.Session()
     
     def send_workout_data(self, workout):
         """Send workout data to TRMNL webhook"""
@@ -461,15 +686,21 @@ class TRMNLWebhookSender:
                     "is_named_workout": workout.is_named_workout,
                     "is_hero_workout": workout.is_hero_workout,
                     "is_rest_day": workout.is_rest_day,
-                    "last_updated": datetime.datetime.now().strftime("%H:%M"),
+                    "last_updated": time.strftime("%H:%M"),
                     "date_code": workout.date_code
                 }
             }
             
-            response = requests.post(
+            if orjson is not None:
+                body = orjson.dumps(payload)
+            else:
+                body = json.dumps(payload, allow_nan=False).encode('utf-8')
+            
+            response = self.session.post(
                 self.webhook_url,
-                json=payload,
-                headers={'Content-Type': 'application/json'}
+                data=body,
+                headers={'Content-Type': 'application/json'},
+                timeout=REQUEST_TIMEOUT
             )
             response.raise_for_status()
             logger.info("Successfully sent workout data to TRMNL")
@@ -479,15 +710,105 @@ class TRMNLWebhookSender:
             logger.error(f"Failed to send data to TRMNL: {e}")
             return False
 
+# Scraper reused by each backfill worker process
+_worker_scraper = None
+
+def _parse_worker(html, date_str):
+    """Parse a fetched workout page inside a backfill worker process"""
+    global _worker_scraper
+    if _worker_scraper is None:
+        _worker_scraper = CrossFitWODScraper()
+    return _worker_scraper.parse_workout_data(html, date_str)
+
+async def main_backfill(dates, csv_file, overwrite=False):
+    """Fetch and log workouts for several dates concurrently"""
+    csv_logger = CSVLogger(csv_file)
+    scraper = CrossFitWODScraper()
+    
+    # Only fill gaps unless we're overwriting
+    if not overwrite:
+        dates = [date for date in dates if not csv_logger.workout_exists(date.strftime("%y%m%d"))]
+    if not dates:
+        logger.info("No workouts to backfill")
+        return
+    
+    logger.info(f"Backfilling {len(dates)} workouts")
+    semaphore = asyncio.Semaphore(BACKFILL_CONCURRENCY)
+    loop = asyncio.get_running_loop()
+    
+    async def fetch_and_parse(session, executor, date):
+        try:
+            async with semaphore:
+                html, date_str = await scraper.fetch_workout_page_async(session, date)
+            
+            # Parse on another core while the remaining pages are still downloading
+            return await loop.run_in_executor(executor, _parse_worker, html, date_str)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            raise  # Already logged by fetch_workout_page_async
+        except Exception as e:
+            logger.error(f"Failed to backfill workout for {date}: {e}")
+            raise
+    
+    connector = aiohttp.TCPConnector(limit_per_host=BACKFILL_CONCURRENCY)
+    timeout = aiohttp.ClientTimeout(sock_connect=REQUEST_TIMEOUT[0], sock_read=REQUEST_TIMEOUT[1])
+    headers = {'User-Agent': scraper.session.headers['User-Agent']}
+    
+    # Spawn rather than fork: aiohttp has resolver threads running by the time workers start
+    with ProcessPoolExecutor(mp_context=multiprocessing.get_context('spawn')) as executor:
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers) as session:
+            results = await asyncio.gather(
+                *(fetch_and_parse(session, executor, date) for date in dates),
+                return_exceptions=True
+            )
+    
+    # Failures were already logged
+    workouts = [result for result in results if not isinstance(result, BaseException)]
+    
+    if csv_logger.log_workouts(sorted(workouts, key=lambda w: w.date_code), overwrite=overwrite):
+        logger.info(f"Backfilled {len(workouts)} of {len(dates)} workouts")
+
+def backfill_dates():
+    """Return the dates requested via BACKFILL_START/BACKFILL_END, or None if not backfilling"""
+    start_env = os.getenv('BACKFILL_START')
+    if not start_env:
+        return None
+    
+    end_env = os.getenv('BACKFILL_END')
+    try:
+        start = datetime.datetime.strptime(start_env, "%Y-%m-%d").date()
+        end = datetime.datetime.strptime(end_env, "%Y-%m-%d").date() if end_env else datetime.date.today()
+    except ValueError:
+        logger.error(f"Invalid date format in BACKFILL_START/BACKFILL_END: {start_env}/{end_env}")
+        return []
+    
+    if end < start:
+        logger.error(f"BACKFILL_END {end} is before BACKFILL_START {start}")
+        return []
+    
+    return [start + datetime.timedelta(days=n) for n in range((end - start).days + 1)]
+
 def main():
     """Main function to scrape workout and send to TRMNL"""
+    csv_file = os.getenv('CROSSFIT_CSV_FILE', 'crossfit_workouts.csv')
+    overwrite_csv = os.getenv('OVERWRITE_CSV', 'false').lower() == 'true'
+    
+    # Backfill mode only logs history to CSV and doesn't update TRMNL
+    dates = backfill_dates()
+    if dates is not None:
+        if aiohttp is None:
+            logger.error("aiohttp is required for backfill mode")
+        elif dates:
+            try:
+                asyncio.run(main_backfill(dates, csv_file, overwrite=overwrite_csv))
+            except Exception as e:
+                logger.error(f"Error backfilling workouts: {e}")
+        return
+    
     webhook_url = os.getenv('TRMNL_WEBHOOK_URL')
     if not webhook_url:
         logger.error("TRMNL_WEBHOOK_URL environment variable not set")
         return
     
-    csv_file = os.getenv('CROSSFIT_CSV_FILE', 'crossfit_workouts.csv')
-    
     date_env = os.getenv('WORKOUT_DATE')
     workout_date = None
     
@@ -498,8 +819,6 @@ def main():
         except ValueError:
             logger.warning(f"Invalid date format in WORKOUT_DATE: {date_env}. Using today's date.")
     
-    overwrite_csv = os.getenv('OVERWRITE_CSV', 'false').lower() == 'true'
-    
     try:
         csv_logger = CSVLogger(csv_file)
         